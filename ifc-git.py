@@ -2,8 +2,18 @@ import os
 import re
 import git
 import bpy
+import json
 import time
+import numpy
+import sqlite3
+import hashlib
+import concurrent.futures
+import ifcopenshell
+import ifcopenshell.geom
+import ifcopenshell.util.element
+import ifcopenshell.util.representation
 from blenderbim.bim.ifc import IfcStore
+import blenderbim.bim.handler
 import blenderbim.tool as tool
 
 
@@ -32,6 +42,19 @@ bl_info = {
 #
 # 2023 Bruno Postle <bruno@postle.net>
 
+# git notes namespace used to store per-commit change statistics
+NOTES_REF = "refs/notes/ifcgit"
+# the well known hash of an empty tree, used to diff root commits
+EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+# entities recorded in the entity index, see element_step_ids()
+INDEXED_CLASSES = [
+    "IfcProduct",
+    "IfcObjectPlacement",
+    "IfcPlacement",
+    "IfcProductRepresentation",
+    "IfcRepresentation",
+]
+
 # GUI CLASSES
 
 
@@ -67,6 +90,15 @@ class IFCGIT_PT_panel(bpy.types.Panel):
                     )
                 else:
                     row.label(text=name_ifc, icon="FILE")
+                if len(context.scene.ifcgit_files) > 1:
+                    box = layout.box()
+                    column = box.column(align=True)
+                    for item in context.scene.ifcgit_files:
+                        row = column.row()
+                        if item.path == name_ifc:
+                            row.label(text=item.path, icon="CHECKBOX_HLT")
+                        else:
+                            row.prop(item, "tracked", text=item.path)
             else:
                 row.operator(
                     "ifcgit.createrepo",
@@ -115,6 +147,27 @@ class IFCGIT_PT_panel(bpy.types.Panel):
         row.prop(bpy.context.scene, "display_branch", text="Browse branch")
         row.prop(bpy.context.scene, "ifcgit_filter", text="Filter revisions")
 
+        if context.scene.ifcgit_filter == "element":
+            row = column.row()
+            if not context.scene.ifcgit_element:
+                row.label(text="No object selected")
+            elif (
+                context.active_object
+                and context.active_object.name == context.scene.ifcgit_element
+            ):
+                row.label(text="Modifying " + context.scene.ifcgit_element)
+            else:
+                row.label(
+                    text="Modifying " + context.scene.ifcgit_element + ", refresh",
+                    icon="ERROR",
+                )
+            if "ifcgit_unindexed" in globals() and ifcgit_unindexed:
+                row.operator(
+                    "ifcgit.index_entities",
+                    text="Index " + str(ifcgit_unindexed) + " revisions",
+                    icon="VIEWZOOM",
+                )
+
         row = column.row()
         row.template_list(
             "COMMIT_UL_List",
@@ -141,6 +194,22 @@ class IFCGIT_PT_panel(bpy.types.Panel):
             row = column.row()
             row.operator("ifcgit.merge", icon="EXPERIMENTAL", text="")
 
+        row = column.row()
+        row.operator("ifcgit.compute_stats", icon="INFO")
+
+        if promisor_remote(ifcgit_repo):
+            row = layout.row()
+            row.label(text="Partial clone, file contents are fetched when needed")
+            row.prop(context.scene, "ifcgit_prefetch")
+            row.operator("ifcgit.prefetch", icon="IMPORT")
+
+        if "ifcgit_diff_summary" in globals() and ifcgit_diff_summary:
+            box = layout.box()
+            column = box.column(align=True)
+            for line in ifcgit_diff_summary:
+                row = column.row()
+                row.label(text=line, icon="FILE")
+
         if not context.scene.ifcgit_commits:
             return
 
@@ -159,6 +228,10 @@ class IFCGIT_PT_panel(bpy.types.Panel):
         row.label(text=commit.author.name + " <" + commit.author.email + ">")
         row = column.row()
         row.label(text=commit.message)
+        if "ifcgit_stats" in globals() and item.hexsha in ifcgit_stats:
+            for line in ifcgit_stats[item.hexsha]:
+                row = column.row()
+                row.label(text=line)
 
 
 class ListItem(bpy.types.PropertyGroup):
@@ -171,9 +244,30 @@ class ListItem(bpy.types.PropertyGroup):
     )
     relevant: bpy.props.BoolProperty(
         name="Is relevant",
-        description="does this commit reference our ifc file",
+        description="does this commit reference our tracked ifc files",
         default=False,
     )
+    stats: bpy.props.StringProperty(
+        name="Change statistics",
+        description="entities added, modified and removed by this commit",
+        default="",
+    )
+
+
+class FileItem(bpy.types.PropertyGroup):
+    """Group of properties representing an IFC file in the repository."""
+
+    path: bpy.props.StringProperty(
+        name="Path",
+        description="path relative to the repository",
+        default="",
+    )
+    tracked: bpy.props.BoolProperty(
+        name="Is tracked",
+        description="include this file when comparing and filtering revisions",
+        default=False,
+        update=lambda self, context: update_revlist(self, context),
+    )
 
 
 class COMMIT_UL_List(bpy.types.UIList):
@@ -204,6 +298,7 @@ class COMMIT_UL_List(bpy.types.UIList):
             )
         else:
             layout.label(text=refs + commit.message, icon="DECORATE_ANIMATE")
+        layout.label(text=item.stats)
         layout.label(text=time.strftime("%c", time.localtime(commit.committed_date)))
 
 
@@ -310,7 +405,7 @@ class CommitChanges(bpy.types.Operator):
 
         path_ifc = bpy.data.scenes["Scene"].BIMProperties.ifc_file
         ifcgit_repo.index.add(path_ifc)
-        ifcgit_repo.index.commit(message=context.scene.commit_message)
+        commit = ifcgit_repo.index.commit(message=context.scene.commit_message)
         context.scene.commit_message = ""
 
         if ifcgit_repo.head.is_detached:
@@ -319,6 +414,17 @@ class CommitChanges(bpy.types.Operator):
             context.scene.display_branch = context.scene.new_branch_name
             context.scene.new_branch_name = ""
 
+        commit_diff = ifc_commit_diff(ifcgit_repo, commit)
+        # the parent may be missing from a partial clone, leave it for later
+        if commit_diff != None:
+            append_entity_index(ifcgit_repo, {commit.hexsha: commit_diff})
+            try:
+                write_stats_note(
+                    ifcgit_repo, commit.hexsha, ifc_commit_stats(commit_diff)
+                )
+            except git.exc.GitCommandError as error:
+                self.report({"WARNING"}, "Change statistics not saved: " + str(error))
+
         bpy.ops.ifcgit.refresh()
 
         return {"FINISHED"}
@@ -341,11 +447,15 @@ class RefreshGit(bpy.types.Operator):
 
         area = next(area for area in bpy.context.screen.areas if area.type == "VIEW_3D")
         area.spaces[0].shading.color_type = "MATERIAL"
+        global ifcgit_diff_summary
+        ifcgit_diff_summary = []
 
         # ifcgit_commits is registered list widget
         context.scene.ifcgit_commits.clear()
 
         path_ifc = bpy.data.scenes["Scene"].BIMProperties.ifc_file
+        update_ifc_files(ifcgit_repo, path_ifc, context.scene.ifcgit_files)
+        paths_ifc = tracked_ifc_paths(ifcgit_repo, path_ifc)
 
         commits = list(
             git.objects.commit.Commit.iter_items(
@@ -357,11 +467,38 @@ class RefreshGit(bpy.types.Operator):
             git.objects.commit.Commit.iter_items(
                 repo=ifcgit_repo,
                 rev=[context.scene.display_branch],
-                paths=[path_ifc],
+                paths=paths_ifc,
             )
         )
         lookup = tags_by_hexsha(ifcgit_repo)
 
+        global ifcgit_stats
+        ifcgit_stats = {}
+        notes = read_stats_notes(ifcgit_repo)
+
+        if context.scene.ifcgit_filter == "element":
+            # the index is only read here, it is updated by IndexEntities
+            indexed = indexed_commits(ifcgit_repo)
+            global ifcgit_unindexed
+            ifcgit_unindexed = len(
+                [commit for commit in commits_relevant if not commit.hexsha in indexed]
+            )
+            commits_element = set()
+            obj = context.active_object
+            context.scene.ifcgit_element = ""
+            if obj and obj.BIMObjectProperties.ifc_definition_id:
+                context.scene.ifcgit_element = obj.name
+                name_ifc = os.path.relpath(path_ifc, ifcgit_repo.working_dir)
+                step_id = obj.BIMObjectProperties.ifc_definition_id
+                element = tool.Ifc.get().by_id(step_id)
+                commits_element = entity_commits(
+                    ifcgit_repo,
+                    [
+                        entity_key(name_ifc, step_id)
+                        for step_id in element_step_ids(element)
+                    ],
+                )
+
         for commit in commits:
 
             if context.scene.ifcgit_filter == "tagged" and not commit.hexsha in lookup:
@@ -371,11 +508,125 @@ class RefreshGit(bpy.types.Operator):
                 and not commit in commits_relevant
             ):
                 continue
+            elif (
+                context.scene.ifcgit_filter == "element"
+                and not commit.hexsha in commits_element
+            ):
+                continue
 
             context.scene.ifcgit_commits.add()
             context.scene.ifcgit_commits[-1].hexsha = commit.hexsha
             if commit in commits_relevant:
                 context.scene.ifcgit_commits[-1].relevant = True
+            if commit.hexsha in notes:
+                summary, lines = summarise_stats(notes[commit.hexsha])
+                context.scene.ifcgit_commits[-1].stats = summary
+                ifcgit_stats[commit.hexsha] = lines
+
+        return {"FINISHED"}
+
+
+class ComputeStats(bpy.types.Operator):
+    """Compute change statistics for listed revisions that don't have them"""
+
+    bl_label = ""
+    bl_idname = "ifcgit.compute_stats"
+    bl_options = {"REGISTER"}
+
+    @classmethod
+    def poll(cls, context):
+        if context.scene.ifcgit_commits:
+            return True
+        return False
+
+    def execute(self, context):
+
+        notes = read_stats_notes(ifcgit_repo)
+        commits = [
+            ifcgit_repo.commit(rev=item.hexsha)
+            for item in context.scene.ifcgit_commits
+            if not item.hexsha in notes
+        ]
+        if not commits:
+            return {"FINISHED"}
+
+        # notes are written one at a time as they are all commits on the
+        # same notes ref, commits missing from a partial clone are skipped
+        for hexsha, commit_diff in ifc_commit_diffs(ifcgit_repo, commits).items():
+            try:
+                write_stats_note(ifcgit_repo, hexsha, ifc_commit_stats(commit_diff))
+            except git.exc.GitCommandError as error:
+                self.report({"ERROR"}, "Change statistics not saved: " + str(error))
+                break
+
+        bpy.ops.ifcgit.refresh()
+
+        return {"FINISHED"}
+
+
+class IndexEntities(bpy.types.Operator):
+    """Index the entities changed by relevant revisions, for filtering by object"""
+
+    bl_label = ""
+    bl_idname = "ifcgit.index_entities"
+    bl_options = {"REGISTER"}
+
+    @classmethod
+    def poll(cls, context):
+        if "ifcgit_unindexed" in globals() and ifcgit_unindexed:
+            return True
+        return False
+
+    def execute(self, context):
+
+        path_ifc = bpy.data.scenes["Scene"].BIMProperties.ifc_file
+        indexed = indexed_commits(ifcgit_repo)
+        commits = [
+            commit
+            for commit in git.objects.commit.Commit.iter_items(
+                repo=ifcgit_repo,
+                rev=[context.scene.display_branch],
+                paths=tracked_ifc_paths(ifcgit_repo, path_ifc),
+            )
+            if not commit.hexsha in indexed
+        ]
+
+        # commits missing from a partial clone are left for later
+        append_entity_index(ifcgit_repo, ifc_commit_diffs(ifcgit_repo, commits))
+        bpy.ops.ifcgit.refresh()
+
+        return {"FINISHED"}
+
+
+class Prefetch(bpy.types.Operator):
+    """Fetch IFC file contents of the most recent listed revisions"""
+
+    bl_label = ""
+    bl_idname = "ifcgit.prefetch"
+    bl_options = {"REGISTER"}
+
+    @classmethod
+    def poll(cls, context):
+        if context.scene.ifcgit_commits and context.scene.ifcgit_prefetch:
+            return True
+        return False
+
+    def execute(self, context):
+
+        path_ifc = bpy.data.scenes["Scene"].BIMProperties.ifc_file
+        paths_ifc = tracked_ifc_paths(ifcgit_repo, path_ifc)
+        revisions = [
+            item.hexsha
+            for item in context.scene.ifcgit_commits[: context.scene.ifcgit_prefetch]
+        ]
+
+        ensure_blobs(ifcgit_repo, revisions, paths_ifc)
+
+        # statistics notes are tiny, fetch them all at the same time
+        notes = missing_notes(ifcgit_repo)
+        if notes:
+            fetch_objects(ifcgit_repo, notes)
+        bpy.ops.ifcgit.refresh()
 
         return {"FINISHED"}
 
@@ -390,28 +641,44 @@ class DisplayRevision(bpy.types.Operator):
     def execute(self, context):
 
         path_ifc = bpy.data.scenes["Scene"].BIMProperties.ifc_file
+        name_ifc = os.path.relpath(path_ifc, ifcgit_repo.working_dir)
+        paths_ifc = tracked_ifc_paths(ifcgit_repo, path_ifc)
         item = context.scene.ifcgit_commits[context.scene.commit_index]
 
         selected_revision = ifcgit_repo.commit(rev=item.hexsha)
         current_revision = ifcgit_repo.commit()
+        global ifcgit_diff_summary
 
         if selected_revision == current_revision:
             area = next(
                 area for area in bpy.context.screen.areas if area.type == "VIEW_3D"
             )
             area.spaces[0].shading.color_type = "MATERIAL"
+            ifcgit_diff_summary = []
             return {"FINISHED"}
 
+        ensure_blobs(
+            ifcgit_repo, [selected_revision.hexsha, current_revision.hexsha], paths_ifc
+        )
+
         if current_revision.committed_date > selected_revision.committed_date:
-            step_ids = ifc_diff_ids(
-                ifcgit_repo, selected_revision.hexsha, current_revision.hexsha, path_ifc
+            step_ids = ifc_diff_ids_federated(
+                ifcgit_repo,
+                selected_revision.hexsha,
+                current_revision.hexsha,
+                paths_ifc,
             )
         else:
-            step_ids = ifc_diff_ids(
-                ifcgit_repo, current_revision.hexsha, selected_revision.hexsha, path_ifc
+            step_ids = ifc_diff_ids_federated(
+                ifcgit_repo,
+                current_revision.hexsha,
+                selected_revision.hexsha,
+                paths_ifc,
             )
 
-        modified_shape_object_step_ids = get_modified_shape_object_step_ids(step_ids)
+        modified_shape_object_step_ids = get_modified_shape_object_step_ids(
+            step_ids, name_ifc
+        )
 
         final_step_ids = {}
         final_step_ids["added"] = step_ids["added"]
@@ -420,7 +687,9 @@ class DisplayRevision(bpy.types.Operator):
             modified_shape_object_step_ids["modified"]
         )
 
-        colourise(final_step_ids)
+        colourise(final_step_ids, name_ifc)
+        # other tracked files have nothing in the scene to colourise
+        ifcgit_diff_summary = summarise_diff(step_ids, name_ifc, paths_ifc)
 
         return {"FINISHED"}
 
@@ -435,14 +704,19 @@ class DisplayUncommitted(bpy.types.Operator):
     def execute(self, context):
 
         path_ifc = bpy.data.scenes["Scene"].BIMProperties.ifc_file
-        step_ids = ifc_diff_ids(ifcgit_repo, None, "HEAD", path_ifc)
-        colourise(step_ids)
+        name_ifc = os.path.relpath(path_ifc, ifcgit_repo.working_dir)
+        paths_ifc = tracked_ifc_paths(ifcgit_repo, path_ifc)
+        ensure_blobs(ifcgit_repo, ["HEAD"], paths_ifc)
+        step_ids = ifc_diff_ids_federated(ifcgit_repo, None, "HEAD", paths_ifc)
+        colourise(step_ids, name_ifc)
+        global ifcgit_diff_summary
+        ifcgit_diff_summary = summarise_diff(step_ids, name_ifc, paths_ifc)
 
         return {"FINISHED"}
 
 
 class SwitchRevision(bpy.types.Operator):
-    """Switches the repository to the selected revision and reloads the IFC file"""
+    """Switches to the selected revision, updating only changed geometry if possible"""
 
     bl_label = ""
     bl_idname = "ifcgit.switch_revision"
@@ -454,6 +728,12 @@ class SwitchRevision(bpy.types.Operator):
 
         path_ifc = bpy.data.scenes["Scene"].BIMProperties.ifc_file
         item = context.scene.ifcgit_commits[context.scene.commit_index]
+        hash_old = ifcgit_repo.head.commit.hexsha
+
+        # checkout would fetch missing contents itself, but without progress
+        ensure_blobs(
+            ifcgit_repo, [item.hexsha], tracked_ifc_paths(ifcgit_repo, path_ifc)
+        )
 
         lookup = branches_by_hexsha(ifcgit_repo)
         if item.hexsha in lookup:
@@ -464,7 +744,15 @@ class SwitchRevision(bpy.types.Operator):
             # NOTE this is calling the git binary in a subprocess
             ifcgit_repo.git.checkout(item.hexsha)
 
-        load_project(path_ifc)
+        # try to reuse what is already in the scene before loading from scratch,
+        # NOTE the geometry cache only applies here, a full load_project has
+        # no way to skip tessellating products and always starts from scratch
+        if tool.Ifc.get() and reload_geometry(
+            ifcgit_repo, hash_old, item.hexsha, path_ifc
+        ):
+            bpy.ops.ifcgit.refresh()
+        else:
+            load_project(path_ifc)
 
         return {"FINISHED"}
 
@@ -495,6 +783,12 @@ class Merge(bpy.types.Operator):
             for branch in lookup[item.hexsha]:
                 if branch.name == context.scene.display_branch:
                     # this is a branch!
+                    ensure_blobs(
+                        ifcgit_repo,
+                        [ifcgit_repo.head.commit, branch.commit]
+                        + ifcgit_repo.merge_base(ifcgit_repo.head.commit, branch),
+                        [os.path.relpath(path_ifc, ifcgit_repo.working_dir)],
+                    )
                     try:
                         # NOTE this is calling the git binary in a subprocess
                         ifcgit_repo.git.merge(branch)
@@ -631,52 +925,571 @@ def ifc_diff_ids(repo, hash_a, hash_b, path_ifc):
     """Given two revision hashes and a filename, retrieve"""
     """step-ids of modified, added and removed entities"""
 
+    step_classes = ifc_diff_classes(repo, hash_a, hash_b, path_ifc)
+
+    return {key: set(step_classes[key]) for key in step_classes}
+
+
+def ifc_diff_classes(repo, hash_a, hash_b, path_ifc):
+    """Given two revision hashes and a filename, retrieve step-ids"""
+    """of modified, added and removed entities mapped to their classes"""
+
     # NOTE this is calling the git binary in a subprocess
     if not hash_a:
-        diff_lines = repo.git.diff(hash_b, path_ifc).split("\n")
+        diff_lines = repo.git.diff(hash_b, "--", path_ifc).split("\n")
     else:
-        diff_lines = repo.git.diff(hash_a, hash_b, path_ifc).split("\n")
+        diff_lines = repo.git.diff(hash_a, hash_b, "--", path_ifc).split("\n")
 
-    inserted = set()
-    deleted = set()
+    inserted = {}
+    deleted = {}
     for line in diff_lines:
-        re_search = re.search(r"^\+#([0-9]+)=", line)
+        re_search = re.search(r"^\+#([0-9]+)= *([A-Za-z0-9_]+)", line)
         if re_search:
-            inserted.add(int(re_search.group(1)))
+            inserted[int(re_search.group(1))] = re_search.group(2).upper()
             continue
-        re_search = re.search(r"^-#([0-9]+)=", line)
+        re_search = re.search(r"^-#([0-9]+)= *([A-Za-z0-9_]+)", line)
         if re_search:
-            deleted.add(int(re_search.group(1)))
+            deleted[int(re_search.group(1))] = re_search.group(2).upper()
+
+    return {
+        "modified": {
+            step_id: inserted[step_id] for step_id in inserted if step_id in deleted
+        },
+        "added": {
+            step_id: inserted[step_id] for step_id in inserted if not step_id in deleted
+        },
+        "removed": {
+            step_id: deleted[step_id] for step_id in deleted if not step_id in inserted
+        },
+    }
+
+
+def ifc_commit_parent(commit):
+    """Hash of the first parent of a commit, or the empty tree"""
+
+    if commit.parents:
+        return commit.parents[0].hexsha
+    return EMPTY_TREE
 
-    modified = inserted.intersection(deleted)
+
+def ifc_changed_paths(repo, hash_parent, hexsha):
+    """IFC filenames changed between a commit and its parent"""
+
+    # NOTE this is calling the git binary in a subprocess
+    paths_ifc = repo.git.diff(
+        "--name-only",
+        "--no-renames",
+        hash_parent,
+        hexsha,
+        "--",
+        "*.ifc",
+        "*.IFC",
+    ).split("\n")
+    return [path_ifc for path_ifc in paths_ifc if path_ifc]
+
+
+def ifc_contents_missing(repo, hash_parent, hexsha, paths_ifc):
+    """Check if a commit can't be diffed without downloading file contents"""
+
+    if missing_blobs(repo, [hexsha], paths_ifc):
+        return True
+    if not hash_parent == EMPTY_TREE and missing_blobs(repo, [hash_parent], paths_ifc):
+        return True
+    return False
+
+
+def ifc_commit_diff(repo, commit):
+    """Entity changes introduced by a commit, keyed by IFC filename,"""
+    """or None if file contents are missing from a partial clone"""
+
+    hash_parent = ifc_commit_parent(commit)
+    paths_ifc = ifc_changed_paths(repo, hash_parent, commit.hexsha)
+
+    # never trigger a download of file contents in a partial clone
+    if ifc_contents_missing(repo, hash_parent, commit.hexsha, paths_ifc):
+        return None
 
     return {
-        "modified": modified,
-        "added": inserted.difference(modified),
-        "removed": deleted.difference(modified),
+        path_ifc: ifc_diff_classes(repo, hash_parent, commit.hexsha, path_ifc)
+        for path_ifc in paths_ifc
     }
 
 
-def get_modified_shape_object_step_ids(step_ids):
+def ifc_commit_diffs(repo, commits):
+    """Entity changes introduced by several commits, keyed by commit hash,"""
+    """commits with file contents missing from a partial clone are left out"""
+
+    # reading commits and trees isn't thread safe, so that happens here and
+    # only git subprocesses are run in parallel
+    parents = {commit.hexsha: ifc_commit_parent(commit) for commit in commits}
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=os.cpu_count() or 1
+    ) as executor:
+        futures = {
+            hexsha: executor.submit(ifc_changed_paths, repo, hash_parent, hexsha)
+            for hexsha, hash_parent in parents.items()
+        }
+        changed = {}
+        for hexsha, future in futures.items():
+            paths_ifc = future.result()
+            if not ifc_contents_missing(repo, parents[hexsha], hexsha, paths_ifc):
+                changed[hexsha] = paths_ifc
+
+        futures = {
+            (hexsha, path_ifc): executor.submit(
+                ifc_diff_classes, repo, parents[hexsha], hexsha, path_ifc
+            )
+            for hexsha, paths_ifc in changed.items()
+            for path_ifc in paths_ifc
+        }
+        result = {hexsha: {} for hexsha in changed}
+        for (hexsha, path_ifc), future in futures.items():
+            result[hexsha][path_ifc] = future.result()
+
+    return result
+
+
+def ifc_commit_stats(commit_diff):
+    """Count added, modified and removed entities by file and class"""
+
+    files = {}
+    for path_ifc, step_classes in commit_diff.items():
+        counts = {}
+        for index, key in enumerate(["added", "modified", "removed"]):
+            for ifc_class in step_classes[key].values():
+                if not ifc_class in counts:
+                    counts[ifc_class] = [0, 0, 0]
+                counts[ifc_class][index] += 1
+        files[path_ifc] = counts
+    return {"files": files}
+
+
+def write_stats_note(repo, hexsha, stats):
+    """Attach change statistics to a commit as a git note"""
+
+    # notes are commits, use the same identity as GitPython does when
+    # committing, which falls back to user and host name if not configured
+    actor = git.Actor.committer(repo.config_reader())
+    identity = {
+        "GIT_AUTHOR_NAME": actor.name,
+        "GIT_AUTHOR_EMAIL": actor.email,
+        "GIT_COMMITTER_NAME": actor.name,
+        "GIT_COMMITTER_EMAIL": actor.email,
+    }
+
+    # NOTE this is calling the git binary in a subprocess
+    repo.git.notes(
+        "--ref",
+        NOTES_REF,
+        "add",
+        "--force",
+        "--message",
+        json.dumps(stats),
+        hexsha,
+        env=identity,
+    )
+
+
+def read_stats_notes(repo):
+    """Retrieve all change statistics notes, keyed by commit hash"""
+
+    result = {}
+    try:
+        # NOTE this is calling the git binary in a subprocess
+        listing = repo.git.notes("--ref", NOTES_REF, "list")
+    except git.exc.GitCommandError:
+        return result
+
+    odb = partial_clone_objects(repo)
+    for line in listing.split("\n"):
+        if not line:
+            continue
+        hash_note, hexsha = line.split()
+        if odb and not odb.has_object(bytes.fromhex(hash_note)):
+            # partial clone, don't fetch while listing history
+            continue
+        try:
+            stream = repo.odb.stream(bytes.fromhex(hash_note))
+            result[hexsha] = json.loads(stream.read())
+        except:
+            # not one of ours, ignore
+            continue
+    return result
+
+
+def missing_notes(repo):
+    """Hashes of statistics notes missing from a partial clone"""
+
+    odb = partial_clone_objects(repo)
+    if not odb:
+        return []
+    try:
+        # NOTE this is calling the git binary in a subprocess
+        listing = repo.git.notes("--ref", NOTES_REF, "list")
+    except git.exc.GitCommandError:
+        return []
+
+    result = []
+    for line in listing.split("\n"):
+        if not line:
+            continue
+        hash_note = line.split()[0]
+        if not odb.has_object(bytes.fromhex(hash_note)):
+            result.append(hash_note)
+    return result
+
+
+def summarise_stats(stats):
+    """A one line summary and per-class detail lines for change statistics"""
+
+    totals = [0, 0, 0]
+    lines = []
+    for path_ifc, counts in sorted(stats["files"].items()):
+        for ifc_class, count in sorted(counts.items()):
+            totals = [total + number for total, number in zip(totals, count)]
+            lines.append(
+                path_ifc
+                + ": "
+                + ifc_class_name(ifc_class)
+                + " +{} ~{} -{}".format(*count)
+            )
+    return "+{} ~{} -{}".format(*totals), lines
+
+
+def ifc_class_name(name):
+    """Convert an upper case STEP keyword to its schema name"""
+
+    try:
+        schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(tool.Ifc.get().schema)
+        return schema.declaration_by_name(name).name()
+    except:
+        return name
+
+
+def promisor_remote(repo):
+    """Name of the remote that provides missing objects in a partial clone"""
+
+    config_reader = repo.config_reader()
+    for remote in repo.remotes:
+        section = 'remote "' + remote.name + '"'
+        if config_reader.has_option(section, "promisor") and config_reader.get_value(
+            section, "promisor"
+        ):
+            return remote.name
+    # older versions of git record this as an extension
+    if config_reader.has_option("extensions", "partialclone"):
+        return config_reader.get_value("extensions", "partialclone")
+    return None
+
+
+def partial_clone_objects(repo):
+    """Local object database of a partial clone, or None for a full clone"""
+
+    if not promisor_remote(repo):
+        return None
+    # this doesn't fetch missing objects, unlike the git binary
+    return git.db.GitDB(os.path.join(repo.git_dir, "objects"))
+
+
+def missing_blobs(repo, revisions, paths_ifc):
+    """Hashes of IFC file contents in these revisions missing from a partial clone"""
+
+    odb = partial_clone_objects(repo)
+    if not odb:
+        return []
+
+    result = []
+    for revision in revisions:
+        # trees are always present in a blobless clone
+        tree = repo.commit(rev=revision).tree
+        for path_ifc in paths_ifc:
+            try:
+                blob = tree / path_ifc
+            except KeyError:
+                continue
+            if not odb.has_object(blob.binsha) and not blob.hexsha in result:
+                result.append(blob.hexsha)
+    return result
+
+
+class FetchProgress(git.RemoteProgress):
+    """Report progress of a fetch with the cursor and the status bar"""
+
+    def __init__(self, offset=0):
+        super().__init__()
+        self.offset = offset
+
+    def update(self, op_code, cur_count, max_count=None, message=""):
+        window_manager = bpy.context.window_manager
+        # the remote counts objects before sending them, only count what arrives
+        if op_code & self.RECEIVING and max_count:
+            window_manager.progress_update(self.offset + cur_count / max_count)
+        # a single large object is 0/1 until it is complete, but the status
+        # line still shows how much has been received
+        bpy.context.workspace.status_text_set(self._cur_line)
+        # the status bar isn't redrawn while an operator is running
+        bpy.ops.wm.redraw_timer(type="DRAW_WIN_SWAP", iterations=1)
+
+
+def fetch_objects(repo, hexshas, progress=None):
+    """Fetch specific objects from the promisor remote of a partial clone"""
+
+    if not progress:
+        progress = git.RemoteProgress()
+
+    # NOTE this is calling the git binary in a subprocess
+    process = repo.git.fetch(
+        promisor_remote(repo),
+        *hexshas,
+        no_tags=True,
+        no_write_fetch_head=True,
+        recurse_submodules="no",
+        filter="blob:none",
+        progress=True,
+        as_process=True,
+        universal_newlines=True,
+    )
+    git.cmd.handle_process_output(
+        process,
+        None,
+        progress.new_message_handler(),
+        finalizer=None,
+        decode_streams=False,
+    )
+    # raises GitCommandError if the fetch failed
+    process.wait(stderr="".join(progress.error_lines))
+
+
+def ensure_blobs(repo, revisions, paths_ifc):
+    """Fetch any IFC file contents of these revisions missing from a"""
+    """partial clone, reporting progress while downloading"""
+
+    missing = [missing_blobs(repo, [revision], paths_ifc) for revision in revisions]
+    missing = [hexshas for hexshas in missing if hexshas]
+    if not missing:
+        return
+
+    window_manager = bpy.context.window_manager
+    window_manager.progress_begin(0, len(missing))
+    try:
+        for index, hexshas in enumerate(missing):
+            fetch_objects(repo, hexshas, FetchProgress(index))
+            window_manager.progress_update(index + 1)
+    finally:
+        bpy.context.workspace.status_text_set(None)
+        window_manager.progress_end()
+
+
+def entity_key(path_ifc, step_id):
+    """Entity index key for a step-id in an IFC file"""
+
+    return path_ifc + "#" + str(step_id)
+
+
+def entity_index_path(repo):
+    """Location of the entity index, inside the .git folder"""
+
+    return os.path.join(repo.git_dir, "ifcgit", "entities.sqlite")
+
+
+def open_entity_index(repo):
+    """Connect to the entity -> commits inverted index, creating it if needed"""
+
+    os.makedirs(os.path.dirname(entity_index_path(repo)), exist_ok=True)
+    connection = sqlite3.connect(entity_index_path(repo))
+    connection.execute("CREATE TABLE IF NOT EXISTS commits (hexsha TEXT PRIMARY KEY)")
+    connection.execute("CREATE TABLE IF NOT EXISTS entities (entity TEXT, hexsha TEXT)")
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS entities_entity ON entities (entity)"
+    )
+    return connection
+
+
+def indexed_commits(repo):
+    """Hashes of commits already in the entity index"""
+
+    connection = open_entity_index(repo)
+    result = {row[0] for row in connection.execute("SELECT hexsha FROM commits")}
+    connection.close()
+    return result
+
+
+def entity_commits(repo, keys):
+    """Hashes of commits that changed any of these entities"""
+
+    connection = open_entity_index(repo)
+    result = {
+        row[0]
+        for row in connection.execute(
+            "SELECT DISTINCT hexsha FROM entities WHERE entity IN ("
+            + ",".join("?" * len(keys))
+            + ")",
+            keys,
+        )
+    }
+    connection.close()
+    return result
+
+
+def is_indexed_class(ifc_class):
+    """Check if entities of an upper case STEP class are indexed"""
+
+    global ifcgit_indexed_classes
+    if not "ifcgit_indexed_classes" in globals():
+        ifcgit_indexed_classes = {}
+    if not ifc_class in ifcgit_indexed_classes:
+        ifcgit_indexed_classes[ifc_class] = False
+        try:
+            schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(
+                tool.Ifc.get().schema
+            )
+            declaration = schema.declaration_by_name(ifc_class)
+            while declaration:
+                if declaration.name() in INDEXED_CLASSES:
+                    ifcgit_indexed_classes[ifc_class] = True
+                    break
+                declaration = declaration.supertype()
+        except:
+            # not an entity in this schema
+            pass
+    return ifcgit_indexed_classes[ifc_class]
+
+
+def append_entity_index(repo, commit_diffs):
+    """Add the products, placements and representations changed by these"""
+    """commits to the entity index"""
+
+    connection = open_entity_index(repo)
+    indexed = {row[0] for row in connection.execute("SELECT hexsha FROM commits")}
+    with connection:
+        for hexsha, commit_diff in commit_diffs.items():
+            if hexsha in indexed:
+                continue
+            connection.execute("INSERT INTO commits VALUES (?)", (hexsha,))
+            connection.executemany(
+                "INSERT INTO entities VALUES (?, ?)",
+                [
+                    (entity_key(path_ifc, step_id), hexsha)
+                    for path_ifc, step_classes in commit_diff.items()
+                    for key in step_classes
+                    for step_id, ifc_class in step_classes[key].items()
+                    if is_indexed_class(ifc_class)
+                ],
+            )
+    connection.close()
+
+
+def element_step_ids(element):
+    """Step-ids of an element, its local placement and its representations"""
+
+    step_ids = {element.id()}
+    placement = getattr(element, "ObjectPlacement", None)
+    if placement:
+        step_ids.add(placement.id())
+        # don't follow PlacementRelTo, parent placements belong to other elements
+        if getattr(placement, "RelativePlacement", None):
+            step_ids.add(placement.RelativePlacement.id())
+    # editing geometry replaces representations, which modifies these
+    representation = getattr(element, "Representation", None)
+    if representation:
+        step_ids.add(representation.id())
+        step_ids.update(item.id() for item in representation.Representations)
+    return step_ids
+
+
+def ifc_diff_ids_federated(repo, hash_a, hash_b, paths_ifc):
+    """Diff several IFC files concurrently, results are"""
+    """keyed by (filename, step-id) tuples"""
+
+    result = {"modified": set(), "added": set(), "removed": set()}
+    workers = min(len(paths_ifc), os.cpu_count() or 1)
+
+    # each diff is a git subprocess, so threads are enough to run them in parallel
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            path_ifc: executor.submit(ifc_diff_ids, repo, hash_a, hash_b, path_ifc)
+            for path_ifc in paths_ifc
+        }
+        for path_ifc, future in futures.items():
+            for key, step_ids in future.result().items():
+                result[key].update((path_ifc, step_id) for step_id in step_ids)
+
+    return result
+
+
+def summarise_diff(step_ids, name_ifc, paths_ifc):
+    """Added, modified and removed counts for tracked files other than"""
+    """the loaded file"""
+
+    counts = {path_ifc: [0, 0, 0] for path_ifc in paths_ifc if path_ifc != name_ifc}
+    for index, key in enumerate(["added", "modified", "removed"]):
+        for path_ifc, step_id in step_ids[key]:
+            if path_ifc in counts:
+                counts[path_ifc][index] += 1
+    return [
+        path_ifc + ": +{} ~{} -{}".format(*count)
+        for path_ifc, count in sorted(counts.items())
+    ]
+
+
+def update_ifc_files(repo, path_ifc, files):
+    """Synchronise a collection property with the IFC files in the repository"""
+
+    name_ifc = os.path.relpath(path_ifc, repo.working_dir)
+    # NOTE this is calling the git binary in a subprocess
+    names = set(repo.git.ls_files("*.ifc", "*.IFC").split("\n"))
+    names.discard("")
+    names.add(name_ifc)
+
+    for index in reversed(range(len(files))):
+        if files[index].path not in names:
+            files.remove(index)
+
+    known = [item.path for item in files]
+    for name in sorted(names):
+        if name not in known:
+            files.add()
+            files[-1].path = name
+
+
+def tracked_ifc_paths(repo, path_ifc):
+    """Relative paths of tracked IFC files, the loaded file is always first"""
+
+    name_ifc = os.path.relpath(path_ifc, repo.working_dir)
+    names = [name_ifc]
+    for item in bpy.context.scene.ifcgit_files:
+        if item.tracked and item.path not in names:
+            names.append(item.path)
+    return names
+
+
+def get_modified_shape_object_step_ids(step_ids, name_ifc):
     model = tool.Ifc.get()
     modified_shape_object_step_ids = {"modified": []}
 
-    for step_id in step_ids["modified"]:
+    for path_ifc, step_id in step_ids["modified"]:
+        # only the loaded file can be queried for related products
+        if path_ifc != name_ifc:
+            continue
         if model.by_id(step_id).is_a() == "IfcProductDefinitionShape":
             product = model.by_id(step_id).ShapeOfProduct[0]
-            modified_shape_object_step_ids["modified"].append(product.id())
+            modified_shape_object_step_ids["modified"].append(
+                (path_ifc, product.id())
+            )
 
     return modified_shape_object_step_ids
 
 
-def colourise(step_ids):
+def colourise(step_ids, name_ifc):
     area = next(area for area in bpy.context.screen.areas if area.type == "VIEW_3D")
     area.spaces[0].shading.color_type = "OBJECT"
 
     for obj in bpy.context.visible_objects:
         if not obj.BIMObjectProperties.ifc_definition_id:
             continue
-        step_id = obj.BIMObjectProperties.ifc_definition_id
+        # objects in the scene belong to the loaded IFC file
+        step_id = (name_ifc, obj.BIMObjectProperties.ifc_definition_id)
         if step_id in step_ids["modified"]:
             obj.color = (0.3, 0.3, 1.0, 1)
         elif step_id in step_ids["added"]:
@@ -696,20 +1509,329 @@ def delete_collection(blender_collection):
             bpy.data.collections.remove(collection)
 
 
+def subgraph_hash(model, entity):
+    """Content hash of an entity and everything it references,"""
+    """independent of the step-ids used in a particular file"""
+
+    digest = hashlib.sha1()
+    if not entity:
+        return digest.hexdigest()
+
+    entities = model.traverse(entity)
+    order = {item.id(): str(index) for index, item in enumerate(entities)}
+
+    def renumber(match):
+        return "#" + order.get(int(match.group(1)), match.group(1))
+
+    for item in entities:
+        digest.update(re.sub(r"#([0-9]+)", renumber, str(item)).encode())
+    return digest.hexdigest()
+
+
+def geometry_roots(element):
+    """Entities that determine the mesh of a product: its representation and"""
+    """the representations and placements of openings voiding it"""
+
+    roots = [element.Representation]
+    for rel in getattr(element, "HasOpenings", []):
+        opening = rel.RelatedOpeningElement
+        roots.append(opening.Representation)
+        placement = opening.ObjectPlacement
+        if getattr(placement, "PlacementRelTo", None) == element.ObjectPlacement:
+            # the usual case, the opening is placed relative to the element
+            roots.append(placement.RelativePlacement)
+        else:
+            roots.append(placement)
+            roots.append(element.ObjectPlacement)
+    return roots
+
+
+def appearance_roots(model, element):
+    """Styles and materials of a product, these are cached with its mesh"""
+
+    roots = []
+    if element.Representation:
+        # styled items point at geometry, so aren't reached by traversing it
+        for entity in model.traverse(element.Representation):
+            if entity.is_a("IfcRepresentationItem"):
+                roots.extend(entity.StyledByItem or [])
+    roots.append(ifcopenshell.util.element.get_material(element))
+    for material in ifcopenshell.util.element.get_materials(element):
+        roots.extend(getattr(material, "HasRepresentation", None) or [])
+    return roots
+
+
+def geometry_hash(model, element):
+    """Content hash of everything that determines the mesh of a product"""
+    """and its materials"""
+
+    roots = geometry_roots(element) + appearance_roots(model, element)
+    hashes = [subgraph_hash(model, root) for root in roots]
+    # the order of openings and styles isn't significant
+    return hashlib.sha1("".join(hashes[:1] + sorted(hashes[1:])).encode()).hexdigest()
+
+
+def geometry_cache_path(repo, key):
+    """Location of cached mesh arrays, inside the .git folder"""
+
+    return os.path.join(repo.git_dir, "ifcgit", "geometry", key[:2], key)
+
+
+# arrays stored for each cached mesh
+GEOMETRY_ARRAYS = ["co", "loops", "totals", "material_index", "uv", "materials"]
+
+
+def write_geometry(repo, key, arrays):
+    """Store mesh arrays in the geometry cache"""
+
+    path_cache = geometry_cache_path(repo, key)
+    os.makedirs(os.path.dirname(path_cache), exist_ok=True)
+    for name, array in zip(GEOMETRY_ARRAYS, arrays):
+        path_array = path_cache + "." + name + ".npy"
+        with open(path_array + ".tmp", "wb") as file_array:
+            numpy.save(file_array, array)
+        os.replace(path_array + ".tmp", path_array)
+
+
+def read_geometry(repo, key):
+    """Memory-map cached mesh arrays, or None if they aren't cached"""
+
+    path_cache = geometry_cache_path(repo, key)
+    try:
+        return [
+            numpy.load(path_cache + "." + name + ".npy", mmap_mode="r")
+            for name in GEOMETRY_ARRAYS
+        ]
+    except OSError:
+        return None
+
+
+def mesh_to_arrays(mesh):
+    """Copy mesh data into numpy arrays"""
+
+    co = numpy.empty(len(mesh.vertices) * 3, dtype=numpy.float32)
+    mesh.vertices.foreach_get("co", co)
+    loops = numpy.empty(len(mesh.loops), dtype=numpy.int32)
+    mesh.loops.foreach_get("vertex_index", loops)
+    totals = numpy.empty(len(mesh.polygons), dtype=numpy.int32)
+    mesh.polygons.foreach_get("loop_total", totals)
+    material_index = numpy.empty(len(mesh.polygons), dtype=numpy.int32)
+    mesh.polygons.foreach_get("material_index", material_index)
+    uv = numpy.empty(0, dtype=numpy.float32)
+    if mesh.uv_layers.active:
+        uv = numpy.empty(len(mesh.loops) * 2, dtype=numpy.float32)
+        mesh.uv_layers.active.data.foreach_get("uv", uv)
+    materials = numpy.array(
+        [material.name if material else "" for material in mesh.materials], dtype=str
+    )
+    return co, loops, totals, material_index, uv, materials
+
+
+def arrays_to_mesh(name, arrays, materials):
+    """Create a new mesh from numpy arrays and a list of materials"""
+
+    co, loops, totals, material_index, uv = arrays[:5]
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(co) // 3)
+    mesh.vertices.foreach_set("co", co)
+    mesh.loops.add(len(loops))
+    mesh.loops.foreach_set("vertex_index", loops)
+    mesh.polygons.add(len(totals))
+    starts = (numpy.cumsum(totals) - totals).astype(numpy.int32)
+    mesh.polygons.foreach_set("loop_start", starts)
+    # newer versions of blender derive loop_total from loop_start
+    if not mesh.polygons.bl_rna.properties["loop_total"].is_readonly:
+        mesh.polygons.foreach_set("loop_total", totals)
+    mesh.polygons.foreach_set("material_index", material_index)
+    if len(uv):
+        mesh.uv_layers.new().data.foreach_set("uv", uv)
+    for material in materials:
+        mesh.materials.append(material)
+    mesh.update()
+    return mesh
+
+
+def tessellate(model, elements):
+    """Triangulate products using all cores, keyed by step-id"""
+
+    result = {}
+    if not elements:
+        return result
+
+    settings = ifcopenshell.geom.settings()
+    iterator = ifcopenshell.geom.iterator(
+        settings, model, os.cpu_count() or 1, include=elements
+    )
+    if iterator.initialize():
+        while True:
+            shape = iterator.get()
+            loops = numpy.array(shape.geometry.faces, dtype=numpy.int32)
+            result[shape.id] = (
+                numpy.array(shape.geometry.verts, dtype=numpy.float32),
+                loops,
+                numpy.full(len(loops) // 3, 3, dtype=numpy.int32),
+            )
+            if not iterator.next():
+                break
+    return result
+
+
+def geometry_step_ids(model, element):
+    """Step-ids of everything that determines the mesh of a product"""
+
+    step_ids = set()
+    for root in geometry_roots(element):
+        if root:
+            step_ids.update(entity.id() for entity in model.traverse(root))
+    return step_ids
+
+
+def reload_geometry(repo, hash_old, hash_new, path_ifc):
+    """Replace the loaded IFC file with the version on disk, updating only"""
+    """meshes that changed. Returns False without modifying anything unless"""
+    """the two revisions differ only in product geometry"""
+
+    # unsaved edits would be lost
+    if IfcStore.edited_objs:
+        return False
+
+    model_old = tool.Ifc.get()
+    model_new = ifcopenshell.open(path_ifc)
+    name_ifc = os.path.relpath(path_ifc, repo.working_dir)
+    step_ids = ifc_diff_ids(repo, hash_old, hash_new, name_ifc)
+    changed_ids = step_ids["modified"] | step_ids["added"] | step_ids["removed"]
+
+    # every change has to be inside the geometry of products, any other
+    # change, including to placements, requires a full load
+    geometry_old = {}
+    geometry_new = {}
+    placements = set()
+    for model, geometry in [(model_old, geometry_old), (model_new, geometry_new)]:
+        for element in model.by_type("IfcProduct"):
+            if element.ObjectPlacement:
+                placements.update(
+                    entity.id() for entity in model.traverse(element.ObjectPlacement)
+                )
+            if element.Representation:
+                geometry[element.id()] = geometry_step_ids(model, element)
+    allowed_old = set().union(*geometry_old.values())
+    allowed_new = set().union(*geometry_new.values())
+    if (
+        not step_ids["removed"] <= allowed_old
+        or not step_ids["added"] <= allowed_new
+        or not step_ids["modified"] <= allowed_old.intersection(allowed_new)
+        or changed_ids.intersection(placements)
+    ):
+        return False
+
+    # prepare every replacement mesh before touching anything
+    replacements = []
+    missing = []
+    for step_id, step_ids_new in geometry_new.items():
+        step_ids_old = geometry_old.get(step_id, set())
+        if not changed_ids.intersection(step_ids_new.union(step_ids_old)):
+            continue
+        obj = IfcStore.id_map.get(step_id)
+        if not obj:
+            # nothing in the scene, such as a hidden opening
+            continue
+        if not obj.type == "MESH":
+            return False
+        # the cache is only filled with meshes that are about to be replaced
+        key_old = geometry_hash(model_old, model_old.by_id(step_id))
+        if not read_geometry(repo, key_old):
+            write_geometry(repo, key_old, mesh_to_arrays(obj.data))
+        element = model_new.by_id(step_id)
+        key = geometry_hash(model_new, element)
+        arrays = read_geometry(repo, key)
+        if not arrays:
+            # tessellated meshes have no UVs and a single material
+            if len(obj.data.materials) > 1 or obj.data.uv_layers:
+                return False
+            missing.append(element)
+        replacements.append((element, obj, key))
+
+    # only tessellate products that have never been seen before
+    keys = {element.id(): key for element, obj, key in replacements}
+    meshes = tessellate(model_new, missing)
+    if not len(meshes) == len(missing):
+        # the geometry iterator couldn't process some products
+        return False
+    for element in missing:
+        obj = IfcStore.id_map[element.id()]
+        co, loops, totals = meshes[element.id()]
+        material_index = numpy.zeros(len(totals), dtype=numpy.int32)
+        uv = numpy.empty(0, dtype=numpy.float32)
+        materials = numpy.array(
+            [material.name if material else "" for material in obj.data.materials],
+            dtype=str,
+        )
+        arrays = co, loops, totals, material_index, uv, materials
+        write_geometry(repo, keys[element.id()], arrays)
+
+    prepared = []
+    for element, obj, key in replacements:
+        arrays = read_geometry(repo, key)
+        materials = []
+        for name in arrays[5]:
+            material = None
+            if name:
+                material = bpy.data.materials.get(str(name))
+                if not material:
+                    return False
+            materials.append(material)
+        prepared.append((element, obj, arrays, materials))
+
+    # swap the file, products keep their step-ids so links to blender objects
+    # remain valid, undo history refers to the previous file
+    IfcStore.file = model_new
+    IfcStore.schema = model_new.schema
+    IfcStore.history = []
+    IfcStore.future = []
+    blenderbim.bim.handler.refresh_ui_data()
+
+    for element, obj, arrays, materials in prepared:
+        mesh_old = obj.data
+        representation = ifcopenshell.util.representation.get_representation(
+            element, "Model", "Body", "MODEL_VIEW"
+        )
+        if representation:
+            name = (
+                str(representation.ContextOfItems.id())
+                + "/"
+                + str(representation.id())
+            )
+        else:
+            name = mesh_old.name
+        mesh = arrays_to_mesh(name, arrays, materials)
+        if representation:
+            mesh.BIMMeshProperties.ifc_definition_id = representation.id()
+        obj.data = mesh
+        if not mesh_old.users:
+            bpy.data.meshes.remove(mesh_old)
+
+    return True
+
+
 def register():
     bpy.utils.register_class(IFCGIT_PT_panel)
     bpy.utils.register_class(ListItem)
+    bpy.utils.register_class(FileItem)
     bpy.utils.register_class(COMMIT_UL_List)
     bpy.utils.register_class(CreateRepo)
     bpy.utils.register_class(AddFileToRepo)
     bpy.utils.register_class(DiscardUncommitted)
     bpy.utils.register_class(CommitChanges)
     bpy.utils.register_class(RefreshGit)
+    bpy.utils.register_class(ComputeStats)
+    bpy.utils.register_class(IndexEntities)
+    bpy.utils.register_class(Prefetch)
     bpy.utils.register_class(DisplayRevision)
     bpy.utils.register_class(DisplayUncommitted)
     bpy.utils.register_class(SwitchRevision)
     bpy.utils.register_class(Merge)
     bpy.types.Scene.ifcgit_commits = bpy.props.CollectionProperty(type=ListItem)
+    bpy.types.Scene.ifcgit_files = bpy.props.CollectionProperty(type=FileItem)
     bpy.types.Scene.commit_index = bpy.props.IntProperty(
         name="Index for my_list", default=0
     )
@@ -723,6 +1845,17 @@ def register():
         description="A short name used to refer to this branch",
         default="",
     )
+    bpy.types.Scene.ifcgit_element = bpy.props.StringProperty(
+        name="Filtered object",
+        description="The object revisions were last filtered for",
+        default="",
+    )
+    bpy.types.Scene.ifcgit_prefetch = bpy.props.IntProperty(
+        name="Prefetch",
+        description="Number of recent revisions to fetch from a partial clone",
+        default=10,
+        min=0,
+    )
     bpy.types.Scene.display_branch = bpy.props.EnumProperty(
         items=git_branches, update=update_revlist
     )
@@ -731,6 +1864,7 @@ def register():
             ("all", "All", "All revisions"),
             ("tagged", "Tagged", "Tagged revisions"),
             ("relevant", "Relevant", "Revisions for this project"),
+            ("element", "Selected", "Revisions modifying the selected object"),
         ],
         update=update_revlist,
     )
@@ -738,19 +1872,26 @@ def register():
 
 def unregister():
     del bpy.types.Scene.ifcgit_commits
+    del bpy.types.Scene.ifcgit_files
     del bpy.types.Scene.commit_index
     del bpy.types.Scene.commit_message
     del bpy.types.Scene.new_branch_name
+    del bpy.types.Scene.ifcgit_prefetch
+    del bpy.types.Scene.ifcgit_element
     del bpy.types.Scene.display_branch
     del bpy.types.Scene.ifcgit_filter
     bpy.utils.unregister_class(IFCGIT_PT_panel)
     bpy.utils.unregister_class(ListItem)
+    bpy.utils.unregister_class(FileItem)
     bpy.utils.unregister_class(COMMIT_UL_List)
     bpy.utils.unregister_class(CreateRepo)
     bpy.utils.unregister_class(AddFileToRepo)
     bpy.utils.unregister_class(DiscardUncommitted)
     bpy.utils.unregister_class(CommitChanges)
     bpy.utils.unregister_class(RefreshGit)
+    bpy.utils.unregister_class(ComputeStats)
+    bpy.utils.unregister_class(IndexEntities)
+    bpy.utils.unregister_class(Prefetch)
     bpy.utils.unregister_class(DisplayRevision)
     bpy.utils.unregister_class(DisplayUncommitted)
     bpy.utils.unregister_class(SwitchRevision)